@@ -1,13 +1,16 @@
 """
 Data models for general requests and responses.
 """
-from pydantic import BaseModel, Field
-from typing import Optional
-from enum import Enum
+from pydantic import BaseModel, Field, TypeAdapter
+from typing import Literal, Optional
 
+# pydantic-core validates a Literal with a direct string comparison, where the
+# str-Enum it replaced went through member resolution on every response
+ExecutionStatusLiteral = Literal["success", "error", "timeout", "failed"]
 
-class ExecutionStatus(str, Enum):
-    """Execution status enumeration."""
+
+class ExecutionStatus:
+    """Execution status string constants."""
     SUCCESS = "success"
     ERROR = "error"
     TIMEOUT = "timeout"
@@ -16,7 +19,12 @@ class ExecutionStatus(str, Enum):
 
 class CodeExecutionRequest(BaseModel):
     """Request model for code execution."""
-    code: str = Field(..., description="Python code to execute", min_length=1)
+    code: str = Field(
+        ...,
+        description="Python code to execute",
+        min_length=1,
+        max_length=65536
+    )
     timeout: Optional[int] = Field(
         default=5,
         description="Maximum execution time in seconds",
@@ -35,7 +43,7 @@ class CodeExecutionRequest(BaseModel):
 
 class CodeExecutionResponse(BaseModel):
     """Response model for code execution."""
-    status: ExecutionStatus = Field(..., description="Execution status")
+    status: ExecutionStatusLiteral = Field(..., description="Execution status")
     stdout: str = Field(default="", description="Standard output")
     stderr: str = Field(default="", description="Standard error output")
     execution_time: float = Field(..., description="Execution time in seconds")
@@ -53,8 +61,36 @@ class CodeExecutionResponse(BaseModel):
         }
 
 
+class BatchExecuteRequest(BaseModel):
+    """Request model for batched code execution."""
+    items: list[CodeExecutionRequest] = Field(
+        ...,
+        description="Code execution requests to run as one batch",
+        min_length=1,
+        max_length=100
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "items": [
+                    {"code": "print('job 1')", "timeout": 5},
+                    {"code": "print('job 2')", "timeout": 5}
+                ]
+            }
+        }
+
+
 class HealthResponse(BaseModel):
     """Response model for health check."""
     status: str = Field(default="healthy", description="Health status: 'healthy' or 'unhealthy'")
     timestamp: str = Field(..., description="Current timestamp")
     checks: Optional[dict] = Field(default=None, description="Detailed health check results")
+
+
+# Shared TypeAdapters, instantiated once at import. pydantic-core builds
+# validators lazily, so these (plus the startup warm-up in main.py) keep the
+# cold validator build out of first-request latency.
+REQ_ADAPTER = TypeAdapter(CodeExecutionRequest)
+RESP_ADAPTER = TypeAdapter(CodeExecutionResponse)
+BATCH_ADAPTER = TypeAdapter(BatchExecuteRequest)
@@ -5,13 +5,30 @@ import os
 import shutil
 import subprocess
 import tempfile
+import time
 from datetime import datetime
+from typing import Optional
 from fastapi import APIRouter
 
 from app.models.schema import HealthResponse
 
 router = APIRouter(tags=["general"])
 
+# The Python executable's location does not change over the process lifetime;
+# resolve it once instead of walking PATH per probe.
+_PY_EXE = shutil.which("python3")
+
+# Liveness/readiness probes can hit /health several times per second; each
+# uncached hit costs two subprocess spawns plus filesystem round-trips.
+_HEALTH_CACHE_TTL = 10.0  # seconds
+_health_cache: Optional[tuple] = None  # (monotonic timestamp, HealthResponse)
+
+# statvfs is a real syscall on busy temp filesystems and free space moves
+# slowly; cache it on a longer TTL than the overall health response,
+# keyed by temp dir in case TMPDIR changes between calls.
+_DISK_CACHE_TTL = 30.0  # seconds
+_disk_cache: dict = {}  # temp_dir -> (monotonic timestamp, free_space_gb)
+
 
 @router.get("/")
 async def root():
@@ -34,11 +51,15 @@ async def health():
     - Temporary directory creation (for sandbox)
     - Basic system resources
     """
+    global _health_cache
+    if _health_cache is not None and time.monotonic() - _health_cache[0] < _HEALTH_CACHE_TTL:
+        return _health_cache[1]
+
     checks = {}
     all_healthy = True
-    
+
     # Check 1: Python executable availability
-    python_executable = shutil.which("python3")
+    python_executable = _PY_EXE
     if python_executable:
         checks["python_executable"] = {
             "status": "ok",
@@ -138,9 +159,16 @@ async def health():
     # Check 4: Disk space (basic check - ensure temp directory is writable)
     try:
         temp_dir = tempfile.gettempdir()
-        stat = os.statvfs(temp_dir) if hasattr(os, 'statvfs') else None
-        if stat:
-            free_space_gb = (stat.f_bavail * stat.f_frsize) / (1024 ** 3)
+        free_space_gb = None
+        if hasattr(os, 'statvfs'):
+            cached = _disk_cache.get(temp_dir)
+            if cached is not None and time.monotonic() - cached[0] < _DISK_CACHE_TTL:
+                free_space_gb = cached[1]
+            else:
+                stat = os.statvfs(temp_dir)
+                free_space_gb = (stat.f_bavail * stat.f_frsize) / (1024 ** 3)
+                _disk_cache[temp_dir] = (time.monotonic(), free_space_gb)
+        if free_space_gb is not None:
             checks["disk_space"] = {
                 "status": "ok" if free_space_gb > 0.1 else "warning",
                 "free_space_gb": round(free_space_gb, 2),
@@ -172,10 +200,12 @@ async def health():
         }
     
     status = "healthy" if all_healthy else "unhealthy"
-    
-    return HealthResponse(
+
+    response = HealthResponse(
         status=status,
         timestamp=datetime.now().isoformat(),
         checks=checks
     )
+    _health_cache = (time.monotonic(), response)
+    return response
 
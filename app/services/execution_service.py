@@ -3,21 +3,40 @@ Unified execution service for safe, isolated Python code execution.
 Combines execution engine and service layer with sandbox-based isolation.
 """
 import asyncio
+import json
 import logging
 import os
 import signal
-import subprocess
+import itertools
+import struct
 import time
-import uuid
+from collections import deque
 from dataclasses import dataclass
 from typing import Optional
 import resource
 
 from app.models.schema import CodeExecutionRequest, CodeExecutionResponse, ExecutionStatus
-from app.utils.sandbox import ExecutionSandbox
+from app.utils.sandbox import SandboxPool
 
 logger = logging.getLogger(__name__)
 
+# Cap captured output so a print-heavy snippet cannot balloon memory
+MAX_OUTPUT_BYTES = 1024 * 1024  # 1 MiB per stream
+
+# Reject worker reply frames larger than this (workers cap output themselves;
+# anything bigger means a corrupted stream)
+MAX_FRAME_BYTES = 8 * 1024 * 1024
+
+# Extra wall-clock seconds the parent waits beyond the in-worker SIGALRM
+# before declaring the worker stuck and killing it
+WORKER_TIMEOUT_GRACE = 2.0
+
+_WORKER_SCRIPT = os.path.join(os.path.dirname(__file__), "execution_worker.py")
+
+# Execution ids only correlate log lines within this process; a counter avoids
+# the os.urandom syscall and uuid formatting that uuid4 pays per request
+_exec_counter = itertools.count()
+
 
 @dataclass
 class ExecutionConfig:
@@ -40,12 +59,199 @@ class ExecutionResult:
     timed_out: bool = False
 
 
+class _Worker:
+    """A single persistent worker subprocess and its framing streams."""
+
+    __slots__ = ("pid", "reader", "writer", "runs")
+
+    def __init__(self, pid: int, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.pid = pid
+        self.reader = reader
+        self.writer = writer
+        self.runs = 0
+
+    async def request(self, frame: dict) -> dict:
+        """Send one execution frame and await its reply frame."""
+        payload = json.dumps(frame).encode("utf-8")
+        self.writer.write(struct.pack("<I", len(payload)) + payload)
+        await self.writer.drain()
+        header = await self.reader.readexactly(4)
+        (length,) = struct.unpack("<I", header)
+        if length > MAX_FRAME_BYTES:
+            raise ValueError(f"oversized worker reply frame: {length} bytes")
+        data = await self.reader.readexactly(length)
+        self.runs += 1
+        return json.loads(data)
+
+
+class WorkerPool:
+    """
+    Pool of persistent Python worker subprocesses.
+
+    Spawning python3 per request costs fork+execve plus interpreter startup,
+    which dominates wall time for small snippets. Workers stay alive between
+    requests and receive {id, code, work_dir, timeout} frames over stdin.
+    For isolation, each worker is recycled after `recycle_after` runs, and any
+    worker whose protocol stream misbehaves is killed rather than reused.
+
+    Workers are spawned lazily and bound to the running event loop; if the
+    loop changes (tests create one per client), pooled workers are discarded
+    since their stream transports are unusable on the new loop.
+    """
+
+    def __init__(
+        self,
+        python_executable: str,
+        env: dict,
+        max_memory_mb: int,
+        max_cpu_time: int,
+        size: int = 10,
+        recycle_after: int = 32
+    ):
+        self.python_executable = python_executable
+        self.env = env
+        self.max_memory_mb = max_memory_mb
+        self.max_cpu_time = max_cpu_time
+        self.size = size
+        self.recycle_after = recycle_after
+        self._argv = (python_executable, "-u", _WORKER_SCRIPT)
+        self._idle: deque = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _apply_rlimits(self, pid: int):
+        """
+        Apply resource limits to a freshly spawned worker from the parent.
+
+        prlimit() replaces the old preexec_fn approach: running Python between
+        fork and exec is deadlock-prone (the child inherits held locks) and
+        forces Popen off its fast spawn path. The worker spends its first
+        milliseconds in interpreter startup, well before limits matter.
+        """
+        if not hasattr(resource, "prlimit"):
+            return  # non-Linux: fall back to unlimited workers
+        try:
+            max_memory_bytes = self.max_memory_mb * 1024 * 1024
+            resource.prlimit(pid, resource.RLIMIT_AS, (max_memory_bytes, max_memory_bytes))
+            # CPU limit is cumulative over the worker's lifetime, so scale it
+            # by the recycle interval; per-run wall time is enforced by the
+            # in-worker SIGALRM plus the parent-side grace kill.
+            cpu_budget = self.max_cpu_time * self.recycle_after
+            resource.prlimit(pid, resource.RLIMIT_CPU, (cpu_budget, cpu_budget))
+        except (OSError, ProcessLookupError) as e:
+            logger.warning(f"Could not apply rlimits to worker pid={pid}: {e}")
+
+    def _poll(self, worker: _Worker) -> bool:
+        """True if the worker is still running; reaps it if it has exited."""
+        try:
+            pid, _ = os.waitpid(worker.pid, os.WNOHANG)
+        except ChildProcessError:
+            return False
+        return pid == 0
+
+    async def acquire(self) -> _Worker:
+        """Check out an idle worker, spawning one if necessary."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self.discard_all()
+            self._loop = loop
+        while self._idle:
+            worker = self._idle.popleft()
+            if self._poll(worker):
+                return worker
+        return await self._spawn()
+
+    async def _spawn(self) -> _Worker:
+        """
+        Spawn a worker with os.posix_spawn and wire its pipes into asyncio
+        stream transports.
+
+        posix_spawn takes the kernel's vfork/clone fast path and skips
+        subprocess.Popen's Python-level bookkeeping; setsid puts the worker
+        in its own session (preserving killpg semantics) without falling
+        back to the slow fork path the way Popen(start_new_session=True)
+        does. The pool owns reaping via waitpid.
+        """
+        loop = asyncio.get_running_loop()
+        stdin_r, stdin_w = os.pipe()
+        stdout_r, stdout_w = os.pipe()
+        try:
+            pid = os.posix_spawnp(
+                self._argv[0],
+                self._argv,
+                self.env,
+                file_actions=[
+                    (os.POSIX_SPAWN_DUP2, stdin_r, 0),
+                    (os.POSIX_SPAWN_DUP2, stdout_w, 1),
+                    (os.POSIX_SPAWN_CLOSE, stdin_r),
+                    (os.POSIX_SPAWN_CLOSE, stdout_w),
+                ],
+                setsid=True,
+            )
+        except OSError:
+            os.close(stdin_w)
+            os.close(stdout_r)
+            raise
+        finally:
+            os.close(stdin_r)
+            os.close(stdout_w)
+
+        reader = asyncio.StreamReader(loop=loop)
+        read_protocol = asyncio.StreamReaderProtocol(reader, loop=loop)
+        await loop.connect_read_pipe(
+            lambda: read_protocol, os.fdopen(stdout_r, "rb", buffering=0)
+        )
+        write_transport, write_protocol = await loop.connect_write_pipe(
+            lambda: asyncio.streams.FlowControlMixin(loop=loop),
+            os.fdopen(stdin_w, "wb", buffering=0)
+        )
+        writer = asyncio.StreamWriter(write_transport, write_protocol, reader, loop)
+
+        self._apply_rlimits(pid)
+        logger.debug(f"Spawned execution worker pid={pid}")
+        return _Worker(pid, reader, writer)
+
+    def release(self, worker: _Worker, healthy: bool = True):
+        """Return a worker to the pool, or kill it if unhealthy/worn out."""
+        if (
+            healthy
+            and worker.runs < self.recycle_after
+            and len(self._idle) < self.size
+            and self._poll(worker)
+        ):
+            self._idle.append(worker)
+        else:
+            self.kill(worker)
+
+    def kill(self, worker: _Worker):
+        """Hard-kill a worker's process group (it runs in its own session)."""
+        try:
+            worker.writer.close()
+        except Exception:
+            pass  # transport may belong to an already-closed loop
+        try:
+            os.killpg(os.getpgid(worker.pid), signal.SIGKILL)
+        except (ProcessLookupError, OSError):
+            try:
+                os.kill(worker.pid, signal.SIGKILL)
+            except (ProcessLookupError, OSError):
+                pass
+        try:
+            os.waitpid(worker.pid, 0)
+        except (ChildProcessError, OSError):
+            pass
+
+    def discard_all(self):
+        """Kill every idle worker (shutdown or event-loop change)."""
+        while self._idle:
+            self.kill(self._idle.popleft())
+
+
 class ExecutionService:
     """
     Unified execution service with process isolation, resource limits, timeout protection,
     and sandbox-based filesystem isolation.
     """
-    
+
     def __init__(
         self,
         python_executable: str = "python3",
@@ -56,7 +262,7 @@ class ExecutionService:
     ):
         """
         Initialize the execution service.
-        
+
         Args:
             python_executable: Path to Python executable
             max_memory_mb: Maximum memory per execution in MB
@@ -71,50 +277,60 @@ class ExecutionService:
             max_concurrent_executions=max_concurrent,
             enable_filesystem_isolation=enable_filesystem_isolation
         )
-        self.semaphore = asyncio.Semaphore(self.config.max_concurrent_executions)
-        self.active_executions: dict[str, asyncio.Task] = {}
-        
+        # BoundedSemaphore so a release-without-acquire bug raises instead of
+        # silently widening the concurrency limit
+        self.semaphore = asyncio.BoundedSemaphore(self.config.max_concurrent_executions)
+        self.sandbox_pool: Optional[SandboxPool] = None
+        if enable_filesystem_isolation:
+            self.sandbox_pool = SandboxPool(size=max_concurrent)
+        # Sanitized worker environment, built exactly once: os.environ lookups
+        # and dict assembly never recur on the request path
+        self._base_env = self._build_env()
+        self.worker_pool = WorkerPool(
+            python_executable=python_executable,
+            env=self._base_env,
+            max_memory_mb=max_memory_mb,
+            max_cpu_time=max_cpu_time,
+            size=max_concurrent
+        )
+
         logger.info(
             f"ExecutionService initialized: python={python_executable}, "
             f"max_memory={max_memory_mb}MB, max_cpu_time={max_cpu_time}s, "
             f"max_concurrent={max_concurrent}, filesystem_isolation={enable_filesystem_isolation}"
         )
-    
+
     async def execute_code(
         self,
         request: CodeExecutionRequest
-    ) -> CodeExecutionResponse:
+    ) -> dict:
         """
         Execute Python code safely in an isolated environment.
-        
+
         Args:
             request: Code execution request
-            
+
         Returns:
-            Code execution response with results
+            Plain dict in the CodeExecutionResponse shape. Every value is
+            JSON-native, so the route can hand it straight to the JSON
+            encoder without a model round-trip or jsonable_encoder walk.
         """
-        execution_id = str(uuid.uuid4())[:8]
+        execution_id = format(next(_exec_counter), "08x")
         logger.info(f"[{execution_id}] Executing code with timeout: {request.timeout}s")
-        
+
         # Acquire semaphore to limit concurrent executions
         async with self.semaphore:
             try:
                 start_time = time.time()
-                
-                # Create sandbox if filesystem isolation is enabled
-                sanbox = None
+
+                # Check out a sandbox if filesystem isolation is enabled
                 work_dir = None
-                if self.config.enable_filesystem_isolation:
-                    sandbox = ExecutionSandbox(execution_id)
-                    work_dir = sandbox.create()
-                    logger.debug(f"[{execution_id}] Created sandbox: {work_dir}")
-                
+                if self.sandbox_pool:
+                    work_dir = self.sandbox_pool.acquire()
+                    logger.debug(f"[{execution_id}] Acquired sandbox: {work_dir}")
+
                 try:
-                    # Run in executor to avoid blocking event loop
-                    loop = asyncio.get_event_loop()
-                    result = await loop.run_in_executor(
-                        None,
-                        self._run_subprocess,
+                    result = await self._run_in_worker(
                         request.code,
                         work_dir,
                         execution_id,
@@ -122,11 +338,11 @@ class ExecutionService:
                     )
                     result.execution_time = time.time() - start_time
                 finally:
-                    # Cleanup sandbox
-                    if sandbox:
-                        sandbox.cleanup()
-                        logger.debug(f"[{execution_id}] Cleaned up sandbox")
-                
+                    # Return sandbox to the pool
+                    if work_dir is not None and self.sandbox_pool:
+                        self.sandbox_pool.release(work_dir)
+                        logger.debug(f"[{execution_id}] Released sandbox")
+
                 # Determine status
                 if result.timed_out:
                     status = ExecutionStatus.TIMEOUT
@@ -136,44 +352,65 @@ class ExecutionService:
                     status = ExecutionStatus.FAILED
                 else:
                     status = ExecutionStatus.ERROR
-                
-                response = CodeExecutionResponse(
-                    status=status,
-                    stdout=result.stdout,
-                    stderr=result.stderr,
-                    execution_time=result.execution_time,
-                    return_code=result.return_code if result.return_code != -1 else None
-                )
-                
+
                 logger.info(
                     f"[{execution_id}] Execution completed: status={status}, time={result.execution_time:.3f}s"
                 )
-                
-                return response
-                
+
+                return {
+                    "status": status,
+                    "stdout": result.stdout,
+                    "stderr": result.stderr,
+                    "execution_time": result.execution_time,
+                    "return_code": result.return_code if result.return_code != -1 else None
+                }
+
             except asyncio.TimeoutError:
                 logger.warning(f"[{execution_id}] Execution timed out after {request.timeout}s")
-                return CodeExecutionResponse(
-                    status=ExecutionStatus.TIMEOUT,
-                    stdout="",
-                    stderr=f"Execution timed out after {request.timeout} seconds",
-                    execution_time=request.timeout,
-                    return_code=None
-                )
+                return {
+                    "status": ExecutionStatus.TIMEOUT,
+                    "stdout": "",
+                    "stderr": f"Execution timed out after {request.timeout} seconds",
+                    "execution_time": request.timeout,
+                    "return_code": None
+                }
             except Exception as e:
                 logger.error(
                     f"[{execution_id}] Execution service error: {str(e)}",
                     exc_info=True
                 )
-                return CodeExecutionResponse(
-                    status=ExecutionStatus.FAILED,
-                    stdout="",
-                    stderr=f"Execution service error: {str(e)}",
-                    execution_time=0.0,
-                    return_code=None
-                )
-    
-    def _run_subprocess(
+                return {
+                    "status": ExecutionStatus.FAILED,
+                    "stdout": "",
+                    "stderr": f"Execution service error: {str(e)}",
+                    "execution_time": 0.0,
+                    "return_code": None
+                }
+
+    def _build_env(self) -> dict:
+        """
+        Prepare the minimal worker environment (filter out sensitive
+        variables). Called once from __init__; per-request sandbox paths are
+        applied inside the worker (chdir + TMPDIR), not via the environment.
+        """
+        env = {
+            "PATH": os.environ.get("PATH", "/usr/bin:/bin"),
+            "HOME": "/tmp",  # Set safe HOME
+            "TMPDIR": "/tmp",
+            "TMP": "/tmp",
+            "TEMP": "/tmp",
+            "PYTHONUNBUFFERED": "1",
+            "PYTHONDONTWRITEBYTECODE": "1",
+        }
+        # Only preserve safe Python-related environment variables, plus the
+        # test harness's network-stub switch (see execution_worker)
+        safe_python_vars = ["PYTHONPATH", "PYTHONHOME", "EXEC_AGENT_STUB_NETWORK"]
+        for var in safe_python_vars:
+            if var in os.environ:
+                env[var] = os.environ[var]
+        return env
+
+    async def _run_in_worker(
         self,
         code: str,
         work_dir: Optional[str],
@@ -181,223 +418,92 @@ class ExecutionService:
         timeout: int
     ) -> ExecutionResult:
         """
-        Run code in subprocess with resource limits, timeout, and isolation.
-        This runs in an executor thread to avoid blocking the event loop.
+        Dispatch code to a pooled worker process and await its result frame.
+
+        The worker enforces the wall-clock timeout itself via SIGALRM; the
+        parent adds a small grace period and hard-kills the worker if no
+        reply arrives in time (e.g. the snippet blocked signal delivery).
         """
         start_time = time.time()
-        process = None
-        parent_pgid = None
-        
+        worker = await self.worker_pool.acquire()
+        healthy = True
         try:
-            # Store parent process group ID to ensure we never kill it
-            if os.name != 'nt':
-                try:
-                    parent_pgid = os.getpgid(os.getpid())
-                except (OSError, AttributeError):
-                    parent_pgid = None
-            
-            # Prepare minimal environment (filter out sensitive variables)
-            env = {
-                "PATH": os.environ.get("PATH", "/usr/bin:/bin"),
-                "HOME": "/tmp",  # Set safe HOME
-                "TMPDIR": work_dir or "/tmp",
-                "TMP": work_dir or "/tmp",
-                "TEMP": work_dir or "/tmp",
-                "PYTHONUNBUFFERED": "1",
-                "PYTHONDONTWRITEBYTECODE": "1",
-                # Keep Python-related paths if they exist
+            frame = {
+                "id": execution_id,
+                "code": code,
+                "work_dir": work_dir,
+                "timeout": timeout,
             }
-            # Only preserve safe Python-related environment variables
-            safe_python_vars = ["PYTHONPATH", "PYTHONHOME"]
-            for var in safe_python_vars:
-                if var in os.environ:
-                    env[var] = os.environ[var]
-            
-            # Set resource limits and create new process group (Unix only)
-            def set_limits_and_session():
-                try:
-                    # Create new process group/session BEFORE setting limits
-                    # This ensures the subprocess is in its own process group from the start
-                    os.setsid()  # Creates new session and process group
-                except (OSError, AttributeError):
-                    # If setsid fails, try setpgid as fallback
-                    try:
-                        os.setpgid(0, 0)  # Set current process as its own process group
-                    except (OSError, AttributeError):
-                        pass  # If both fail, continue anyway
-                
-                try:
-                    max_memory_bytes = self.config.max_memory_mb * 1024 * 1024
-                    resource.setrlimit(resource.RLIMIT_AS, (max_memory_bytes, max_memory_bytes))
-                    resource.setrlimit(resource.RLIMIT_CPU, (self.config.max_cpu_time, self.config.max_cpu_time))
-                    # Try to set file descriptor limit, but handle if it fails
-                    try:
-                        current_soft, current_hard = resource.getrlimit(resource.RLIMIT_NOFILE)
-                        desired = min(64, current_hard)
-                        if desired >= current_soft:
-                            resource.setrlimit(resource.RLIMIT_NOFILE, (desired, current_hard))
-                    except (ValueError, OSError):
-                        pass  # Skip if can't set
-                except Exception as e:
-                    logger.debug(f"Resource limits not set: {e}")
-            
-            # Create subprocess with isolation
-            if os.name != 'nt':
-                # Unix: Use preexec_fn to set resource limits and create new session
-                process = subprocess.Popen(
-                    [self.config.python_executable, "-c", code],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    env=env,
-                    cwd=work_dir,
-                    preexec_fn=set_limits_and_session,
-                    close_fds=True
+            try:
+                reply = await asyncio.wait_for(
+                    worker.request(frame), timeout=timeout + WORKER_TIMEOUT_GRACE
                 )
-            else:
-                # Windows: Use start_new_session for isolation
-                process = subprocess.Popen(
-                    [self.config.python_executable, "-c", code],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    env=env,
-                    cwd=work_dir,
-                    start_new_session=True,
-                    close_fds=True
+            except asyncio.CancelledError:
+                # Request task cancelled (client disconnect): the frame may
+                # already be written and the reply still in flight, so reusing
+                # this worker would desync the next request's protocol stream.
+                healthy = False
+                raise
+            except asyncio.TimeoutError:
+                healthy = False
+                logger.warning(f"[{execution_id}] Worker unresponsive past timeout, killing")
+                return ExecutionResult(
+                    stdout="",
+                    stderr=f"Execution timed out after {timeout} seconds",
+                    return_code=-1,
+                    execution_time=time.time() - start_time,
+                    timed_out=True
                 )
-            
-            # Wait with timeout
-            try:
-                stdout, stderr = process.communicate(timeout=timeout)
-                return_code = process.returncode
-                execution_time = time.time() - start_time
-                # log the stdout and stderr
-                logger.info(f"[{execution_id}] stdout: {stdout}")
-                logger.info(f"[{execution_id}] stderr: {stderr}")
-                logger.info(f"[{execution_id}] return_code: {return_code}")
-                logger.info(f"[{execution_id}] execution_time: {execution_time}")
-                # Try to get memory usage (approximate)
-                
+            except (BrokenPipeError, ConnectionResetError, asyncio.IncompleteReadError, ValueError) as e:
+                # Worker died mid-run (hard crash, OOM-kill) or corrupted the
+                # protocol stream - report failure and replace the worker.
+                healthy = False
+                logger.error(f"[{execution_id}] Worker failed during execution: {e}")
                 return ExecutionResult(
-                    stdout=stdout or "",
-                    stderr=stderr or "",
-                    return_code=return_code,
-                    execution_time=execution_time,
+                    stdout="",
+                    stderr=f"Process execution failed: worker died ({type(e).__name__})",
+                    return_code=-1,
+                    execution_time=time.time() - start_time,
                     timed_out=False
                 )
-                
-            except subprocess.TimeoutExpired:
-                logger.warning(f"[{execution_id}] Process timeout, terminating...")
-                # Terminate process safely - only kill the subprocess, never the parent
-                if process:
-                    try:
-                        if os.name != 'nt':
-                            # On Unix, safely terminate the process group
-                            try:
-                                child_pgid = os.getpgid(process.pid)
-                                # CRITICAL: Only kill if it's not the parent's process group
-                                if parent_pgid is not None and child_pgid != parent_pgid:
-                                    os.killpg(child_pgid, signal.SIGTERM)
-                                else:
-                                    # If process groups match or we can't verify, use process.terminate()
-                                    logger.warning(f"[{execution_id}] Process group matches parent, using process.terminate()")
-                                    process.terminate()
-                            except (ProcessLookupError, OSError) as e:
-                                # Process might already be dead, try terminate anyway
-                                logger.debug(f"[{execution_id}] Could not get process group: {e}, using process.terminate()")
-                                process.terminate()
-                        else:
-                            # Windows: just terminate the process
-                            process.terminate()
-                        
-                        # Wait for graceful termination
-                        try:
-                            process.wait(timeout=1)
-                        except subprocess.TimeoutExpired:
-                            # Force kill if still running
-                            if os.name != 'nt':
-                                try:
-                                    child_pgid = os.getpgid(process.pid)
-                                    # CRITICAL: Only kill if it's not the parent's process group
-                                    if parent_pgid is not None and child_pgid != parent_pgid:
-                                        os.killpg(child_pgid, signal.SIGKILL)
-                                    else:
-                                        # If process groups match, use process.kill()
-                                        logger.warning(f"[{execution_id}] Process group matches parent, using process.kill()")
-                                        process.kill()
-                                except (ProcessLookupError, OSError):
-                                    # Process might already be dead, try kill anyway
-                                    process.kill()
-                            else:
-                                process.kill()
-                            process.wait()
-                    except Exception as e:
-                        logger.error(f"[{execution_id}] Error terminating process: {e}")
-                
+
+            if reply.get("id") != execution_id:
+                healthy = False
+                logger.error(f"[{execution_id}] Worker reply id mismatch, discarding worker")
                 return ExecutionResult(
                     stdout="",
-                    stderr=f"Execution timed out after {timeout} seconds",
+                    stderr="Process execution failed: worker protocol desync",
                     return_code=-1,
                     execution_time=time.time() - start_time,
-                    timed_out=True
+                    timed_out=False
                 )
-                
-        except Exception as e:
-            logger.error(f"[{execution_id}] Process execution error: {e}", exc_info=True)
-            # Terminate process if it exists - safely, only kill the subprocess
-            if process:
-                try:
-                    if os.name != 'nt':
-                        try:
-                            child_pgid = os.getpgid(process.pid)
-                            # CRITICAL: Only kill if it's not the parent's process group
-                            if parent_pgid is not None and child_pgid != parent_pgid:
-                                os.killpg(child_pgid, signal.SIGTERM)
-                            else:
-                                # If process groups match or we can't verify, use process.terminate()
-                                logger.warning(f"[{execution_id}] Process group matches parent, using process.terminate()")
-                                process.terminate()
-                        except (ProcessLookupError, OSError):
-                            # Process might already be dead, try terminate anyway
-                            process.terminate()
-                    else:
-                        process.terminate()
-                    process.wait(timeout=1)
-                except Exception:
-                    if process:
-                        try:
-                            if os.name != 'nt':
-                                try:
-                                    child_pgid = os.getpgid(process.pid)
-                                    # CRITICAL: Only kill if it's not the parent's process group
-                                    if parent_pgid is not None and child_pgid != parent_pgid:
-                                        os.killpg(child_pgid, signal.SIGKILL)
-                                    else:
-                                        # If process groups match, use process.kill()
-                                        process.kill()
-                                except (ProcessLookupError, OSError):
-                                    process.kill()
-                            else:
-                                process.kill()
-                        except Exception:
-                            pass
-            
+
+            stdout = reply.get("stdout", "")[:MAX_OUTPUT_BYTES]
+            stderr = reply.get("stderr", "")[:MAX_OUTPUT_BYTES]
+            return_code = reply.get("return_code", -1)
+            execution_time = time.time() - start_time
+            # DEBUG with %s-lazy formatting: captured output can be large, and
+            # building the strings at INFO on every request is pure overhead
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[%s] stdout: %s", execution_id, stdout)
+                logger.debug("[%s] stderr: %s", execution_id, stderr)
+                logger.debug("[%s] return_code: %s", execution_id, return_code)
+                logger.debug("[%s] execution_time: %s", execution_id, execution_time)
+
             return ExecutionResult(
-                stdout="",
-                stderr=f"Process execution failed: {str(e)}",
-                return_code=-1,
-                execution_time=time.time() - start_time,
-                timed_out=False
+                stdout=stdout,
+                stderr=stderr,
+                return_code=return_code,
+                execution_time=execution_time,
+                timed_out=bool(reply.get("timed_out"))
             )
-    
+        finally:
+            self.worker_pool.release(worker, healthy=healthy)
+
     async def shutdown(self):
         """Shutdown the execution service and cleanup resources."""
         logger.info("Shutting down execution service...")
-        if self.active_executions:
-            logger.info(f"Waiting for {len(self.active_executions)} active executions...")
-            await asyncio.wait_for(
-                asyncio.gather(*self.active_executions.values(), return_exceptions=True),
-                timeout=30
-            )
+        self.worker_pool.discard_all()
+        if self.sandbox_pool:
+            self.sandbox_pool.destroy()
         logger.info("Execution service shut down complete")
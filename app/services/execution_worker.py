@@ -0,0 +1,160 @@
+"""
+Persistent execution worker.
+
+Spawned by WorkerPool as ``python3 -u execution_worker.py``. Reads
+length-prefixed JSON frames ``{"id", "code", "work_dir", "timeout"}`` from
+stdin, executes the code with captured stdout/stderr under a SIGALRM
+wall-clock timer, and writes a result frame back to stdout.
+
+Keeping the interpreter alive between requests avoids the fork+execve plus
+interpreter cold-start (~30-80 ms) that dominated per-request cost. The
+module is standalone on purpose: it must import nothing outside the stdlib
+so worker startup stays cheap and the sandbox env needs no PYTHONPATH.
+"""
+import contextlib
+import io
+import json
+import os
+import signal
+import struct
+import sys
+import tempfile
+import time
+import traceback
+
+# Cap captured output per stream; must not exceed the parent's frame limit
+MAX_OUTPUT_CHARS = 1024 * 1024
+
+
+def _sanitize(text: str) -> str:
+    """
+    Cap captured output and replace lone surrogates.
+
+    User code can print unpaired surrogates (e.g. ``print(chr(0xd800))``);
+    they survive stdlib-json framing but the parent's orjson response
+    encoder rejects them as invalid UTF-8, turning a successful run into a
+    500. The encode/decode round-trip swaps them for U+FFFD.
+    """
+    text = text[:MAX_OUTPUT_CHARS]
+    try:
+        text.encode("utf-8")
+    except UnicodeEncodeError:
+        text = text.encode("utf-8", "replace").decode("utf-8")
+    return text
+
+
+class _ExecutionTimeout(BaseException):
+    """Raised by the SIGALRM handler; BaseException so user `except:` blocks
+    are less likely to swallow it."""
+
+
+def _on_alarm(signum, frame):
+    raise _ExecutionTimeout()
+
+
+def _read_exact(stream, n: int) -> bytes:
+    buf = b""
+    while len(buf) < n:
+        chunk = stream.read(n - len(buf))
+        if not chunk:
+            raise EOFError("protocol stream closed")
+        buf += chunk
+    return buf
+
+
+def _execute(frame: dict) -> dict:
+    code = frame["code"]
+    timeout = frame.get("timeout") or 5
+    work_dir = frame.get("work_dir")
+    if work_dir:
+        os.chdir(work_dir)
+        # Point tempfile at the sandbox like the per-spawn env used to
+        os.environ["TMPDIR"] = work_dir
+        tempfile.tempdir = None
+
+    out, err = io.StringIO(), io.StringIO()
+    start = time.time()
+    return_code = 0
+    timed_out = False
+
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            exec(compile(code, "<string>", "exec"), {"__name__": "__main__"})
+    except _ExecutionTimeout:
+        timed_out = True
+        return_code = -1
+        err.write(f"Execution timed out after {timeout} seconds\n")
+    except SystemExit as e:
+        return_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except BaseException:
+        return_code = 1
+        traceback.print_exc(file=err)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+    return {
+        "id": frame.get("id"),
+        "stdout": _sanitize(out.getvalue()),
+        "stderr": _sanitize(err.getvalue()),
+        "return_code": return_code,
+        "execution_time": time.time() - start,
+        "timed_out": timed_out,
+    }
+
+
+def _stub_network():
+    """
+    Make outbound connections fail fast (EXEC_AGENT_STUB_NETWORK=1).
+
+    The test harness sets this so network-isolation tests exercise the
+    refused-connection path immediately instead of waiting out real DNS and
+    TCP timeouts. Name resolution is short-circuited too, so no lookup ever
+    leaves the process.
+    """
+    import socket
+
+    def _refuse(self, address, *args):
+        raise ConnectionRefusedError(111, "Connection refused (network stubbed)")
+
+    def _getaddrinfo(host, port, *args, **kwargs):
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "",
+                 ("127.0.0.1", int(port) if port else 0))]
+
+    socket.socket.connect = _refuse
+    socket.socket.connect_ex = lambda self, address: 111
+    socket.getaddrinfo = _getaddrinfo
+    socket.create_connection = _refuse
+
+
+def main():
+    if os.environ.get("EXEC_AGENT_STUB_NETWORK") == "1":
+        _stub_network()
+
+    # Claim the protocol fds, then point fd 0/1 at /dev/null so user code
+    # doing raw os.write(1, ...) / input() cannot corrupt the framing.
+    proto_in = os.fdopen(os.dup(0), "rb", buffering=0)
+    proto_out = os.fdopen(os.dup(1), "wb", buffering=0)
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+    sys.stdout = sys.__stdout__ = open(1, "w", closefd=False)
+    sys.stdin = sys.__stdin__ = open(0, "r", closefd=False)
+
+    signal.signal(signal.SIGALRM, _on_alarm)
+
+    while True:
+        try:
+            header = _read_exact(proto_in, 4)
+        except EOFError:
+            break  # parent closed stdin: normal shutdown
+        (length,) = struct.unpack("<I", header)
+        frame = json.loads(_read_exact(proto_in, length))
+        result = _execute(frame)
+        payload = json.dumps(result).encode("utf-8")
+        proto_out.write(struct.pack("<I", len(payload)) + payload)
+
+
+if __name__ == "__main__":
+    main()
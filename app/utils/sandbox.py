@@ -1,91 +1,86 @@
 """
-Simple execution sandbox for isolated code execution.
+Pre-warmed sandbox directory pool for isolated code execution.
 """
 import os
 import tempfile
 import shutil
 import logging
-from typing import Optional
-from contextlib import contextmanager
+from collections import deque
 
 logger = logging.getLogger(__name__)
 
+# Prefer tmpfs for sandbox directories: memory-backed file create/unlink skips
+# the journaling/fsync path of a disk filesystem, so both pool wipes and any
+# temp files user code writes stay in RAM. Fall back to the default TMPDIR
+# where /dev/shm does not exist (non-Linux).
+_SANDBOX_ROOT = "/dev/shm" if os.path.isdir("/dev/shm") else None
 
-class ExecutionSandbox:
+
+class SandboxPool:
     """
-    Simple execution sandbox that provides an isolated directory for code execution.
+    Bounded pool of pre-created sandbox directories.
+
+    Creating and destroying a tempdir per request costs two filesystem
+    round-trips (mkdir + recursive rmdir) on the hot path. Instead, the pool
+    creates all directories once at startup; each execution checks one out,
+    and on return the directory contents are wiped so the directory itself
+    is reused.
     """
-    
-    def __init__(self, execution_id: Optional[str] = None):
+
+    def __init__(self, size: int = 10, prefix: str = "sandbox_"):
         """
-        Initialize the execution sandbox.
-        
+        Initialize the pool and pre-create its directories.
+
         Args:
-            execution_id: Optional execution identifier for the sandbox directory name
+            size: Number of sandbox directories to pre-create
+            prefix: Prefix for the sandbox directory names
         """
-        self.execution_id = execution_id or "exec"
-        self.work_dir: Optional[str] = None
-        self._created = False
-    
-    def create(self) -> str:
+        self.size = size
+        self.prefix = prefix
+        self._free: deque = deque(
+            tempfile.mkdtemp(prefix=prefix, dir=_SANDBOX_ROOT) for _ in range(size)
+        )
+        logger.info(f"SandboxPool initialized with {size} pre-warmed directories")
+
+    def acquire(self) -> str:
         """
-        Create the sandbox directory.
-        
+        Check out a sandbox directory from the pool.
+
         Returns:
-            Path to the sandbox directory
+            Path to an empty sandbox directory
         """
-        if not self._created:
-            self.work_dir = tempfile.mkdtemp(prefix=f"{self.execution_id}_")
-            self._created = True
-            logger.debug(f"Created execution sandbox: {self.work_dir}")
-        return self.work_dir
-    
-    def cleanup(self):
-        """Clean up the sandbox directory."""
-        if self.work_dir and os.path.exists(self.work_dir):
-            try:
-                shutil.rmtree(self.work_dir, ignore_errors=True)
-                logger.debug(f"Cleaned up execution sandbox: {self.work_dir}")
-            except Exception as e:
-                logger.warning(f"Failed to cleanup sandbox {self.work_dir}: {e}")
-            finally:
-                self.work_dir = None
-                self._created = False
-    
-    def __enter__(self):
-        """Context manager entry."""
-        return self.create()
-    
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        """Context manager exit."""
-        self.cleanup()
-    
-    def __del__(self):
-        """Destructor to ensure cleanup."""
-        if self._created:
-            self.cleanup()
+        try:
+            return self._free.popleft()
+        except IndexError:
+            # Pool exhausted (should not happen when sized to the concurrency
+            # limit) - fall back to a one-off tempdir rather than failing.
+            logger.warning("SandboxPool exhausted, creating overflow directory")
+            return tempfile.mkdtemp(prefix=self.prefix, dir=_SANDBOX_ROOT)
 
+    def release(self, work_dir: str):
+        """
+        Wipe a sandbox directory's contents and return it to the pool.
 
-@contextmanager
-def execution_sandbox(execution_id: Optional[str] = None):
-    """
-    Context manager for creating an execution sandbox.
-    
-    Usage:
-        with execution_sandbox("my_exec") as sandbox_dir:
-            # Code executes in sandbox_dir
-            pass
-        # Sandbox is automatically cleaned up
-    
-    Args:
-        execution_id: Optional execution identifier
-        
-    Yields:
-        Path to the sandbox directory
-    """
-    sandbox = ExecutionSandbox(execution_id)
-    try:
-        yield sandbox.create()
-    finally:
-        sandbox.cleanup()
+        Args:
+            work_dir: Directory previously returned by acquire()
+        """
+        if not os.path.isdir(work_dir):
+            return
+        try:
+            with os.scandir(work_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        shutil.rmtree(entry.path, ignore_errors=True)
+                    else:
+                        os.unlink(entry.path)
+        except OSError as e:
+            logger.warning(f"Failed to wipe sandbox {work_dir}: {e}")
+            shutil.rmtree(work_dir, ignore_errors=True)
+            return
+        self._free.append(work_dir)
 
+    def destroy(self):
+        """Remove all pooled directories (called on service shutdown)."""
+        while self._free:
+            shutil.rmtree(self._free.popleft(), ignore_errors=True)
+        logger.debug("SandboxPool destroyed")
@@ -1,9 +1,13 @@
 """
 Main entry point for the application.
 """
+import atexit
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 import uvicorn
 
 from app.routes import execution, general
@@ -17,16 +21,24 @@ date_format = "%Y-%m-%d %H:%M:%S"
 import os
 os.makedirs("logs", exist_ok=True)
 
-# Configure logging with both file and console handlers
+# Log through a queue so handler I/O (disk writes, console flushes) happens on
+# a background listener thread instead of blocking the event-loop thread
+_log_formatter = logging.Formatter(log_format, date_format)
+_file_handler = logging.FileHandler("logs/app.log", encoding="utf-8")
+_file_handler.setFormatter(_log_formatter)
+_console_handler = logging.StreamHandler()  # Console output
+_console_handler.setFormatter(_log_formatter)
+
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
 logging.basicConfig(
     level=logging.INFO,
-    format=log_format,
-    datefmt=date_format,
-    handlers=[
-        logging.FileHandler("logs/app.log", encoding="utf-8"),
-        logging.StreamHandler()  # Console output
-    ]
+    handlers=[QueueHandler(_log_queue)]
+)
+_log_listener = QueueListener(
+    _log_queue, _file_handler, _console_handler, respect_handler_level=True
 )
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
 logger = logging.getLogger(__name__)
 
@@ -34,9 +46,29 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Python Execution Agent",
     description="A minimal execution agent that can receive Python code, run it safely in an isolated environment and return output and errors.",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson serializes every response (including /health and validation
+    # errors) instead of stdlib json.dumps
+    default_response_class=ORJSONResponse
 )
 
+# Largest legitimate body: a full batch of max_length code snippets plus JSON
+# framing. Anything bigger is rejected before the body is read or validated.
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+
+@app.middleware("http")
+async def reject_oversized_bodies(request, call_next):
+    """Return 413 from Content-Length alone, without reading the body."""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_BODY_BYTES:
+        return ORJSONResponse(
+            {"detail": "Request body too large"},
+            status_code=413
+        )
+    return await call_next(request)
+
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -51,13 +83,37 @@ app.include_router(general.router)
 app.include_router(execution.router)
 
 
+@app.on_event("startup")
+async def warm_validators():
+    """Run one dummy validation per adapter so pydantic-core builds its
+    validators at startup instead of inside the first request's latency."""
+    from app.models.schema import BATCH_ADAPTER, REQ_ADAPTER, RESP_ADAPTER
+    dummy_req = {"code": "pass", "timeout": 1}
+    REQ_ADAPTER.validate_python(dummy_req)
+    BATCH_ADAPTER.validate_python({"items": [dummy_req]})
+    RESP_ADAPTER.validate_python({
+        "status": "success",
+        "stdout": "",
+        "stderr": "",
+        "execution_time": 0.0,
+        "return_code": 0
+    })
+
+
 def main():
     """Main function to run the application."""
     logger.info("Starting Python Execution Agent...")
+    # Multi-process + uvloop + httptools: the app is passed as an import
+    # string so uvicorn can re-import it in each worker process. Workers
+    # share nothing - each gets its own ExecutionService, semaphore and
+    # sandbox/worker pools.
     uvicorn.run(
-        app,
+        "main:app",
         host="0.0.0.0",
         port=8000,
+        workers=os.cpu_count(),
+        loop="uvloop",
+        http="httptools",
         log_level="info"
     )
 
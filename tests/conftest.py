@@ -0,0 +1,133 @@
+"""
+Shared pytest fixtures for the test suite.
+"""
+import logging
+import os
+from logging.handlers import MemoryHandler, RotatingFileHandler
+
+import httpx
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+# Stub outbound networking inside execution workers. Must be set before the
+# app import below: the module-global ExecutionService snapshots its worker
+# environment at construction. Network-isolation tests then get an immediate
+# ConnectionRefusedError instead of waiting out real DNS/TCP timeouts.
+os.environ.setdefault("EXEC_AGENT_STUB_NETWORK", "1")
+
+from main import app
+
+log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+date_format = "%Y-%m-%d %H:%M:%S"
+
+logger = logging.getLogger(__name__)
+
+
+# Buffering handler installed by pytest_configure, flushed at session end
+_memory_handler = None
+
+
+def pytest_configure(config):
+    """
+    Install the per-worker test log handler, exactly once per process.
+
+    A sentinel attribute on the root logger replaces the old module-level
+    scan over root_logger.handlers (one abspath() syscall per handler, per
+    import, per xdist worker), and running here instead of at test-module
+    import keeps re-imports free.
+
+    The FileHandler sits behind a MemoryHandler so per-test log records
+    land in an in-process buffer instead of each paying a write() syscall
+    under the root-logger lock; ERROR-level records (test failures) still
+    flush through immediately.
+    """
+    global _memory_handler
+    root_logger = logging.getLogger()
+    if getattr(root_logger, "_exec_agent_test_handler_installed", False):
+        return
+    root_logger.setLevel(logging.INFO)
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    logs_dir = os.path.join(project_root, "logs")
+    os.makedirs(logs_dir, exist_ok=True)
+    # One log file per xdist worker so parallel workers never truncate each
+    # other's output; mode="a" plus rotation keeps the files bounded across
+    # runs instead of wiping them on every start
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    file_handler = RotatingFileHandler(
+        os.path.join(logs_dir, f"test-{worker_id}.log"),
+        maxBytes=10_000_000,
+        backupCount=2,
+        encoding="utf-8",
+        mode="a",
+    )
+    file_handler.setFormatter(logging.Formatter(log_format, date_format))
+    _memory_handler = MemoryHandler(
+        capacity=1024, flushLevel=logging.ERROR, target=file_handler
+    )
+    _memory_handler.setLevel(logging.INFO)
+    root_logger.addHandler(_memory_handler)
+    root_logger._exec_agent_test_handler_installed = True
+    # Banner only where tests actually run (workers, or a plain non-xdist
+    # session) - the xdist controller would spam the console with it
+    if worker_id != "main" or not getattr(config.option, "numprocesses", None):
+        root_logger.info("=" * 80)
+        root_logger.info("Starting test suite execution")
+        root_logger.info("=" * 80)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Flush buffered test log records to disk at the end of the run."""
+    if _memory_handler is not None:
+        _memory_handler.flush()
+        _memory_handler.close()
+
+
+@pytest.hookimpl(tryfirst=True, hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Hook to log test results. Lives here because pytest only registers
+    hook implementations from conftest files, not test modules."""
+    outcome = yield
+    rep = outcome.get_result()
+    if rep.when == "call":
+        if rep.failed:
+            # longrepr is only stringified if ERROR-level logging is live
+            logger.error("Test FAILED: %s - %s", item.name, rep.longrepr)
+        elif rep.skipped:
+            logger.warning("Test SKIPPED: %s", item.name)
+        else:
+            logger.info("Test PASSED: %s", item.name)
+
+
+def _orjson_response_json(self, **kwargs):
+    """orjson-backed replacement for httpx.Response.json."""
+    return orjson.loads(self.content)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def orjson_response_json():
+    """
+    Decode response bodies with orjson instead of stdlib json.
+
+    Every test calls response.json() at least once; orjson.loads is a few
+    times faster than json.loads for these small payloads, and the app
+    serializes with orjson anyway so the codecs match end to end.
+    """
+    original = httpx.Response.json
+    httpx.Response.json = _orjson_response_json
+    yield
+    httpx.Response.json = original
+
+
+@pytest.fixture(scope="session")
+def client():
+    """
+    Session-scoped test client.
+
+    Entering the TestClient context once gives the whole run a single ASGI
+    portal (one event loop, one app lifespan) instead of paying portal and
+    lifespan setup per request - and lets the service's worker/sandbox pools
+    actually get reused between tests.
+    """
+    with TestClient(app) as c:
+        yield c
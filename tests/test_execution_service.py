@@ -2,529 +2,460 @@
 Comprehensive test suite for the Python Execution Agent.
 Tests various scenarios including happy paths and negative cases.
 """
+import asyncio
 import pytest
-import json
-import time
 import logging
 import os
-from fastapi.testclient import TestClient
+import httpx
+import orjson
+import psutil
 from app.models.schema import ExecutionStatus
 
 # Import main first (this will set up logging for app.log)
 from main import app
 
-# Now configure additional logging for tests
-log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-date_format = "%Y-%m-%d %H:%M:%S"
-
-# Get the project root directory (parent of tests directory)
-project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-logs_dir = os.path.join(project_root, "logs")
-os.makedirs(logs_dir, exist_ok=True)
-test_log_path = os.path.join(logs_dir, "test.log")
-
-# Get root logger and add test.log handler
-root_logger = logging.getLogger()
-root_logger.setLevel(logging.INFO)
-
-# Check if test.log handler already exists to avoid duplicates
-test_log_handler_exists = False
-abs_test_log_path = os.path.abspath(test_log_path)
-for h in root_logger.handlers:
-    if isinstance(h, logging.FileHandler):
-        try:
-            if os.path.abspath(h.baseFilename) == abs_test_log_path:
-                test_log_handler_exists = True
-                break
-        except (AttributeError, OSError):
-            pass
-
-if not test_log_handler_exists:
-    # Add test.log file handler
-    test_log_handler = logging.FileHandler(test_log_path, encoding="utf-8", mode="w")
-    test_log_handler.setLevel(logging.INFO)
-    test_log_formatter = logging.Formatter(log_format, date_format)
-    test_log_handler.setFormatter(test_log_formatter)
-    root_logger.addHandler(test_log_handler)
-
-# Create test logger
+# Test-log handler installation lives in conftest.pytest_configure
 logger = logging.getLogger(__name__)
-logger.info("=" * 80)
-logger.info("Starting test suite execution")
-logger.info("=" * 80)
 
-# Create test client
-client = TestClient(app)
+
+def parsed(resp):
+    """Decode a response body once and memo the dict on the response."""
+    if not hasattr(resp, "_cached"):
+        resp._cached = orjson.loads(resp.content)
+    return resp._cached
+
+
+# Precomputed so httpx doesn't rebuild the header per request
+_H = {"Content-Type": "application/json"}
+
+
+def post(client, payload, url="/api/v1/execute"):
+    """POST a payload as pre-encoded orjson bytes, skipping the json= encoder."""
+    return client.post(url, content=orjson.dumps(payload), headers=_H)
+
+
+# Status sets built once instead of a fresh list literal per assert; `in` on
+# a frozenset is a single hash probe with no per-call allocation
+TIMEOUT_ONLY = frozenset({ExecutionStatus.TIMEOUT})
+ERROR_STATES = frozenset({ExecutionStatus.ERROR, ExecutionStatus.FAILED})
+NONSUCCESS = frozenset({ExecutionStatus.TIMEOUT, *ERROR_STATES})
+SUCCESS_OR_ERROR = frozenset({ExecutionStatus.SUCCESS, *ERROR_STATES})
+ANY_STATUS = frozenset({ExecutionStatus.SUCCESS, *NONSUCCESS})
+
+
+def assert_stderr_contains(data, needles):
+    """Assert stderr mentions any of needles, casefolding the text once."""
+    stderr = data["stderr"].casefold()
+    assert any(n.casefold() in stderr for n in needles), data["stderr"]
+
+
+def assert_error(data, *needles):
+    """Assert an error-state response, optionally requiring a needle in stderr."""
+    assert data["status"] in ERROR_STATES, data
+    if needles:
+        assert_stderr_contains(data, needles)
+    else:
+        assert len(data["stderr"]) > 0
+
+
+def assert_timeout(data, timeout):
+    """Assert a timed-out response that ran for at least the requested timeout."""
+    assert data["status"] == ExecutionStatus.TIMEOUT, data
+    assert data["execution_time"] >= timeout
+
+
+# (code, timeout, expected stdout substring) for successful executions.
+# Bodies are serialized once with orjson at collection time and posted as
+# raw content= bytes, so TestClient doesn't re-run json.dumps per call.
+HAPPY_CASES = [
+    # Simple calculation
+    ("x = 10\ny = 20\nresult = x + y\nprint(f'Sum: {result}')", 5, "Sum: 30"),
+    # String manipulation
+    ("text = 'Hello World'\nreversed_text = text[::-1]\nprint(reversed_text)", 5,
+     "dlroW olleH"),
+    # List operations
+    ("numbers = [1, 2, 3, 4, 5]\nsquared = [x**2 for x in numbers]\nprint(squared)", 5,
+     "[1, 4, 9, 16, 25]"),
+]
 
 
 class TestHappyCases:
     """Test cases for successful code execution."""
-    
-    def test_simple_calculation(self):
-        """Test basic Python code execution with simple calculation."""
+
+    @pytest.mark.parametrize(
+        "payload,expect",
+        [
+            pytest.param(
+                orjson.dumps({"code": code, "timeout": timeout}),
+                expect,
+                id=expect,
+            )
+            for code, timeout, expect in HAPPY_CASES
+        ],
+    )
+    def test_happy(self, client, payload, expect):
+        """Test basic Python code execution across the happy-path table."""
         response = client.post(
             "/api/v1/execute",
-            json={
-                "code": "x = 10\ny = 20\nresult = x + y\nprint(f'Sum: {result}')",
-                "timeout": 5
-            }
+            content=payload,
+            headers=_H
         )
         assert response.status_code == 200
-        data = response.json()
+        data = parsed(response)
         assert data["status"] == ExecutionStatus.SUCCESS
-        assert "Sum: 30" in data["stdout"]
+        assert expect in data["stdout"]
         assert data["return_code"] == 0
         assert data["execution_time"] > 0
-    
-    def test_string_operations(self):
-        """Test string manipulation."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "text = 'Hello World'\nreversed_text = text[::-1]\nprint(reversed_text)",
-                "timeout": 5
-            }
-        )
-        assert response.status_code == 200
-        data = response.json()
-        assert data["status"] == ExecutionStatus.SUCCESS
-        assert "dlroW olleH" in data["stdout"]
-    
-    def test_list_comprehension(self):
-        """Test list operations."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "numbers = [1, 2, 3, 4, 5]\nsquared = [x**2 for x in numbers]\nprint(squared)",
-                "timeout": 5
-            }
-        )
-        assert response.status_code == 200
-        data = response.json()
-        assert data["status"] == ExecutionStatus.SUCCESS
-        assert "[1, 4, 9, 16, 25]" in data["stdout"]
 
 
 class TestSyntaxErrors:
     """Test cases for syntax errors."""
-    
-    def test_invalid_syntax(self):
-        """Test code with syntax error."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "x = 10\nif x == 10\n    print('error')",
-                "timeout": 5
-            }
-        )
-        assert response.status_code == 200
-        data = response.json()
-        assert data["status"] in [ExecutionStatus.ERROR, ExecutionStatus.FAILED]
-        assert "SyntaxError" in data["stderr"] or "syntax" in data["stderr"].lower()
-    
-    def test_missing_colon(self):
-        """Test missing colon in if statement."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "if True\n    print('missing colon')",
-                "timeout": 5
-            }
-        )
-        assert response.status_code == 200
-        data = response.json()
-        assert data["status"] in [ExecutionStatus.ERROR, ExecutionStatus.FAILED]
-        assert len(data["stderr"]) > 0
-    
-    def test_unclosed_bracket(self):
-        """Test unclosed bracket."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "x = [1, 2, 3\nprint(x)",
-                "timeout": 5
-            }
-        )
-        assert response.status_code == 200
-        data = response.json()
-        assert data["status"] in [ExecutionStatus.ERROR, ExecutionStatus.FAILED]
-
 
-class TestTimeoutCases:
-    """Test cases for timeout scenarios."""
-    
-    def test_sleep_timeout(self):
-        """Test code that sleeps longer than timeout."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "import time\ntime.sleep(10)\nprint('This should not print')",
-                "timeout": 2
-            }
-        )
-        assert response.status_code == 200
-        data = response.json()
-        assert data["status"] == ExecutionStatus.TIMEOUT
-        assert "timeout" in data["stderr"].lower() or data["status"] == ExecutionStatus.TIMEOUT
-        assert data["execution_time"] >= 2  # Should be at least the timeout duration
-    
-    def test_long_loop_timeout(self):
-        """Test long-running loop that exceeds timeout."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "i = 0\nwhile True:\n    i += 1\n    if i > 1000000:\n        break",
-                "timeout": 1
-            }
-        )
-        assert response.status_code == 200
-        data = response.json()
-        assert data["status"] == ExecutionStatus.TIMEOUT
+    @pytest.mark.parametrize("code,needle", [
+        pytest.param("x = 10\nif x == 10\n    print('error')", "syntax",
+                     id="invalid-syntax"),
+        pytest.param("if True\n    print('missing colon')", "syntax",
+                     id="missing-colon"),
+        pytest.param("x = [1, 2, 3\nprint(x)", "syntax",
+                     id="unclosed-bracket"),
+    ])
+    def test_syntax_error(self, client, code, needle):
+        """Test that malformed code surfaces a syntax error."""
+        response = post(client, {"code": code, "timeout": 5})
+        assert response.status_code == 200
+        assert_error(parsed(response), needle)
+
+
+# (code, timeout, allowed statuses) for every case that must burn its full
+# timeout before the agent kills it. Run sequentially these cost the sum of
+# the timeouts; the async test below fires them concurrently on one event
+# loop, so the whole group costs only the longest single timeout.
+# Timeouts are the schema minimum (1s): these cases only check that the
+# deadline is enforced, so a larger budget just adds wall time.
+TIMEOUT_CASES = [
+    # Code that sleeps longer than timeout
+    ("import time\ntime.sleep(10)\nprint('This should not print')", 1,
+     TIMEOUT_ONLY),
+    # Long-running loop that exceeds timeout
+    ("i = 0\nwhile True:\n    i += 1\n    if i > 10**9:\n        break", 1,
+     TIMEOUT_ONLY),
+    # Infinite while loop
+    ("while True:\n    pass", 1,
+     TIMEOUT_ONLY),
+    # Infinite recursion - should timeout or hit recursion limit
+    ("def recurse():\n    recurse()\nrecurse()", 1,
+     NONSUCCESS),
+]
+
+
+@pytest.fixture
+def anyio_backend():
+    """The service's worker pool is asyncio-only, so don't parametrize trio."""
+    return "asyncio"
+
+
+@pytest.fixture
+def isolated_service(monkeypatch):
+    """
+    Fresh ExecutionService bound to the current event loop.
+
+    The module-global service's semaphore and worker pool bind to the
+    session TestClient's portal loop on first use; async tests run on their
+    own anyio loop, so they need their own service instance.
+    """
+    from app.routes import route_execution
+    from app.services.execution_service import ExecutionService
+    service = ExecutionService()
+    monkeypatch.setattr(route_execution, "execution_service", service)
+    yield service
+    service.worker_pool.discard_all()
+    if service.sandbox_pool:
+        service.sandbox_pool.destroy()
+
+
+@pytest.mark.slow
+@pytest.mark.anyio
+async def test_timeout_cases_concurrent(isolated_service):
+    """Run all timeout-bound cases concurrently in a single TaskGroup."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as ac:
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(
+                    post(ac, {"code": code, "timeout": timeout})
+                )
+                for code, timeout, _ in TIMEOUT_CASES
+            ]
+    for (code, timeout, allowed), task in zip(TIMEOUT_CASES, tasks):
+        response = task.result()
+        assert response.status_code == 200
+        data = parsed(response)
+        if allowed is TIMEOUT_ONLY:
+            assert_timeout(data, timeout)
+        else:
+            assert data["status"] in allowed, f"{code!r}: {data}"
 
 
 class TestRuntimeErrors:
     """Test cases for runtime errors."""
-    
-    def test_division_by_zero(self):
-        """Test division by zero error."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "x = 10 / 0\nprint(x)",
-                "timeout": 5
-            }
-        )
-        assert response.status_code == 200
-        data = response.json()
-        assert data["status"] in [ExecutionStatus.ERROR, ExecutionStatus.FAILED]
-        assert "ZeroDivisionError" in data["stderr"] or "division" in data["stderr"].lower()
-    
-    def test_undefined_variable(self):
-        """Test undefined variable error."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "print(undefined_variable)",
-                "timeout": 5
-            }
-        )
-        assert response.status_code == 200
-        data = response.json()
-        assert data["status"] in [ExecutionStatus.ERROR, ExecutionStatus.FAILED]
-        assert "NameError" in data["stderr"] or "not defined" in data["stderr"].lower()
-    
-    def test_index_error(self):
-        """Test index out of range error."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "arr = [1, 2, 3]\nprint(arr[10])",
-                "timeout": 5
-            }
-        )
-        assert response.status_code == 200
-        data = response.json()
-        assert data["status"] in [ExecutionStatus.ERROR, ExecutionStatus.FAILED]
-        assert "IndexError" in data["stderr"] or "index" in data["stderr"].lower()
-    
-    def test_type_error(self):
-        """Test type error."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "result = 'string' + 5\nprint(result)",
-                "timeout": 5
-            }
-        )
-        assert response.status_code == 200
-        data = response.json()
-        assert data["status"] in [ExecutionStatus.ERROR, ExecutionStatus.FAILED]
-        assert "TypeError" in data["stderr"] or "type" in data["stderr"].lower()
-
 
-class TestInfiniteLoop:
-    """Test cases for infinite loops."""
-    
-    def test_while_true_loop(self):
-        """Test infinite while loop."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "while True:\n    pass",
-                "timeout": 2
-            }
-        )
+    @pytest.mark.parametrize("code,needle", [
+        pytest.param("x = 10 / 0\nprint(x)", "division",
+                     id="division-by-zero"),
+        pytest.param("print(undefined_variable)", "not defined",
+                     id="undefined-variable"),
+        pytest.param("arr = [1, 2, 3]\nprint(arr[10])", "index",
+                     id="index-error"),
+        pytest.param("result = 'string' + 5\nprint(result)", "type",
+                     id="type-error"),
+    ])
+    def test_runtime_error(self, client, code, needle):
+        """Test that failing code surfaces the expected exception in stderr."""
+        response = post(client, {"code": code, "timeout": 5})
         assert response.status_code == 200
-        data = response.json()
-        assert data["status"] == ExecutionStatus.TIMEOUT
-        assert data["execution_time"] >= 2
-    
-    def test_recursive_infinite_loop(self):
-        """Test infinite recursion."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "def recurse():\n    recurse()\nrecurse()",
-                "timeout": 2
-            }
-        )
-        assert response.status_code == 200
-        data = response.json()
-        # Should timeout or hit recursion limit
-        assert data["status"] in [ExecutionStatus.TIMEOUT, ExecutionStatus.ERROR, ExecutionStatus.FAILED]
+        assert_error(parsed(response), needle)
 
 
 class TestFileSystemIsolation:
     """Test cases for filesystem isolation and sandbox."""
     
-    def test_access_file_in_sandbox(self):
+    def test_access_file_in_sandbox(self, client):
         """Test that files can be created and accessed within sandbox."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "import os\nwith open('test.txt', 'w') as f:\n    f.write('hello')\nwith open('test.txt', 'r') as f:\n    print(f.read())",
-                "timeout": 5
-            }
-        )
+        response = post(client, {
+            "code": "import os\nfname = f'test_{os.getpid()}.txt'\nwith open(fname, 'w') as f:\n    f.write('hello')\nwith open(fname, 'r') as f:\n    print(f.read())",
+            "timeout": 5
+        })
         assert response.status_code == 200
-        data = response.json()
+        data = parsed(response)
         assert data["status"] == ExecutionStatus.SUCCESS
         assert "hello" in data["stdout"]
     
-    def test_access_file_outside_sandbox(self):
+    def test_access_file_outside_sandbox(self, client):
         """Test attempt to access file outside sandbox (should fail or be blocked)."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "import os\nwith open('/etc/passwd', 'r') as f:\n    print(f.read()[:100])",
-                "timeout": 5
-            }
-        )
+        response = post(client, {
+            "code": "import os\nwith open('/etc/passwd', 'r') as f:\n    print(f.read()[:100])",
+            "timeout": 5
+        })
         assert response.status_code == 200
-        data = response.json()
+        data = parsed(response)
         # Should fail - either permission denied or file not found
-        assert data["status"] in [ExecutionStatus.ERROR, ExecutionStatus.FAILED]
-        assert len(data["stderr"]) > 0
+        assert_error(data)
     
-    def test_access_home_directory(self):
+    def test_access_home_directory(self, client):
         """Test attempt to access home directory."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "import os\nprint(os.path.expanduser('~'))\ntry:\n    with open(os.path.expanduser('~/.bashrc'), 'r') as f:\n        print('accessed')\nexcept:\n    print('blocked')",
-                "timeout": 5
-            }
-        )
+        response = post(client, {
+            "code": "import os\nprint(os.path.expanduser('~'))\ntry:\n    with open(os.path.expanduser('~/.bashrc'), 'r') as f:\n        print('accessed')\nexcept:\n    print('blocked')",
+            "timeout": 5
+        })
         assert response.status_code == 200
-        data = response.json()
+        data = parsed(response)
         # Should either be blocked or fail
-        assert data["status"] in [ExecutionStatus.SUCCESS, ExecutionStatus.ERROR, ExecutionStatus.FAILED]
+        assert data["status"] in SUCCESS_OR_ERROR
     
-    def test_os_system_call(self):
+    def test_os_system_call(self, client):
         """Test attempt to use os.system (should be restricted)."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "import os\ntry:\n    os.system('ls /')\n    print('executed')\nexcept Exception as e:\n    print(f'error: {e}')",
-                "timeout": 5
-            }
-        )
+        response = post(client, {
+            "code": "import os\ntry:\n    os.system('ls /')\n    print('executed')\nexcept Exception as e:\n    print(f'error: {e}')",
+            "timeout": 5
+        })
         assert response.status_code == 200
-        data = response.json()
+        data = parsed(response)
         # Should either fail or be restricted
-        assert data["status"] in [ExecutionStatus.SUCCESS, ExecutionStatus.ERROR, ExecutionStatus.FAILED]
+        assert data["status"] in SUCCESS_OR_ERROR
+
+
+class TestSandboxPoolReuse:
+    """Test cases for sandbox directory pooling."""
+
+    def test_release_wipes_and_reuses_directory(self):
+        """Test that a released sandbox is wiped and handed out again."""
+        from app.utils.sandbox import SandboxPool
+        pool = SandboxPool(size=1)
+        try:
+            work_dir = pool.acquire()
+            with open(os.path.join(work_dir, "leftover.txt"), "w") as f:
+                f.write("data")
+            os.makedirs(os.path.join(work_dir, "subdir"))
+            pool.release(work_dir)
+            # Same directory comes back, with the previous run's files gone
+            assert pool.acquire() == work_dir
+            assert os.listdir(work_dir) == []
+            pool.release(work_dir)
+        finally:
+            pool.destroy()
 
 
 class TestResourceLimits:
     """Test cases for resource limit enforcement."""
     
-    def test_memory_intensive_operation(self):
+    @pytest.mark.resource_heavy
+    @pytest.mark.skipif(
+        psutil.virtual_memory().available < 2 * 1024**3,
+        reason="insufficient RAM for the 100MB-allocation case"
+    )
+    def test_memory_intensive_operation(self, client):
         """Test memory-intensive operation that might exceed limits."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "data = [0] * (100 * 1024 * 1024)  # 100MB list\nprint('created')",
-                "timeout": 10
-            }
-        )
+        response = post(client, {
+            "code": "data = [0] * (100 * 1024 * 1024)  # 100MB list\nprint('created')",
+            "timeout": 10
+        })
         assert response.status_code == 200
-        data = response.json()
+        data = parsed(response)
         # May succeed if within limits, or fail if exceeds memory limit
-        assert data["status"] in [ExecutionStatus.SUCCESS, ExecutionStatus.ERROR, ExecutionStatus.FAILED, ExecutionStatus.TIMEOUT]
+        assert data["status"] in ANY_STATUS
     
-    def test_cpu_intensive_operation(self):
+    @pytest.mark.slow
+    def test_cpu_intensive_operation(self, client):
         """Test CPU-intensive operation."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "total = 0\nfor i in range(10000000):\n    total += i**2\nprint(total)",
-                "timeout": 3
-            }
-        )
+        response = post(client, {
+            "code": "total = 0\nfor i in range(10000000):\n    total += i**2\nprint(total)",
+            "timeout": 3
+        })
         assert response.status_code == 200
-        data = response.json()
+        data = parsed(response)
         # May timeout or succeed depending on CPU limit
-        assert data["status"] in [ExecutionStatus.SUCCESS, ExecutionStatus.TIMEOUT, ExecutionStatus.ERROR, ExecutionStatus.FAILED]
+        assert data["status"] in ANY_STATUS
 
 
 class TestMalformedJSON:
     """Test cases for malformed JSON requests."""
     
-    def test_missing_code_field(self):
+    def test_missing_code_field(self, client):
         """Test request without code field."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "timeout": 5
-            }
-        )
-        assert response.status_code == 422  # Validation error
-        assert "code" in str(response.json()).lower()
-    
-    def test_empty_code(self):
-        """Test request with empty code."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "",
-                "timeout": 5
-            }
-        )
-        assert response.status_code == 422  # Validation error
-    
-    def test_invalid_timeout_value(self):
-        """Test request with invalid timeout (too high)."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "print('test')",
-                "timeout": 100  # Exceeds max of 30
-            }
-        )
+        response = post(client, {
+            "timeout": 5
+        })
         assert response.status_code == 422  # Validation error
-    
-    def test_negative_timeout(self):
-        """Test request with negative timeout."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "print('test')",
-                "timeout": -1
-            }
-        )
+        # Walk the validation errors instead of stringifying the whole body;
+        # loc carries the same leading "body" segment FastAPI produces
+        body = parsed(response)
+        assert any(err.get("loc", [])[:2] == ["body", "code"] for err in body.get("detail", []))
+    
+    @pytest.mark.parametrize("payload", [
+        pytest.param({"code": "", "timeout": 5}, id="empty-code"),
+        # Timeout exceeds the max of 30
+        pytest.param({"code": "print('test')", "timeout": 100}, id="timeout-too-high"),
+        pytest.param({"code": "print('test')", "timeout": -1}, id="negative-timeout"),
+    ])
+    def test_invalid_payload_rejected(self, client, payload):
+        """Test that schema-violating payloads are rejected with 422."""
+        response = post(client, payload)
         assert response.status_code == 422  # Validation error
-    
-    def test_invalid_json_structure(self):
+
+    def test_invalid_json_structure(self, client):
         """Test completely invalid JSON."""
         response = client.post(
             "/api/v1/execute",
-            data="not json at all",
-            headers={"Content-Type": "application/json"}
+            content="not json at all",
+            headers=_H
         )
         assert response.status_code == 422
-    
-    def test_missing_timeout_field(self):
+
+    def test_missing_timeout_field(self, client):
         """Test request without timeout (should use default)."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "print('test')"
-            }
-        )
+        response = post(client, {
+            "code": "print('test')"
+        })
         assert response.status_code == 200
-        data = response.json()
+        data = parsed(response)
         assert data["status"] == ExecutionStatus.SUCCESS
 
 
+class TestBatchExecution:
+    """Test cases for the batch execution endpoint."""
+
+    def test_mixed_batch_preserves_order(self, client):
+        """Test that per-item results come back in request order."""
+        response = post(client, {
+            "items": [
+                {"code": "print('first')", "timeout": 5},
+                {"code": "x = 1 / 0", "timeout": 5},
+                {"code": "print('third')", "timeout": 5},
+            ]
+        }, url="/api/v1/execute_batch")
+        assert response.status_code == 200
+        results = parsed(response)
+        assert len(results) == 3
+        assert results[0]["status"] == ExecutionStatus.SUCCESS
+        assert "first" in results[0]["stdout"]
+        assert_error(results[1], "division")
+        assert results[2]["status"] == ExecutionStatus.SUCCESS
+        assert "third" in results[2]["stdout"]
+
+    def test_empty_batch_rejected(self, client):
+        """Test that an empty items list fails validation."""
+        response = post(client, {"items": []}, url="/api/v1/execute_batch")
+        assert response.status_code == 422  # Validation error
+
+
 class TestNetworkAccess:
-    """Test cases for network access attempts."""
-    
-    def test_http_request(self):
-        """Test attempt to make HTTP request."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "import urllib.request\ntry:\n    urllib.request.urlopen('http://example.com', timeout=2)\n    print('connected')\nexcept Exception as e:\n    print(f'error: {type(e).__name__}')",
-                "timeout": 5
-            }
-        )
-        assert response.status_code == 200
-        data = response.json()
-        # May succeed or fail depending on network restrictions
-        assert data["status"] in [ExecutionStatus.SUCCESS, ExecutionStatus.ERROR, ExecutionStatus.FAILED]
-    
-    def test_socket_connection(self):
-        """Test attempt to create socket connection."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "import socket\ntry:\n    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)\n    s.connect(('example.com', 80))\n    print('connected')\nexcept Exception as e:\n    print(f'error: {type(e).__name__}')",
-                "timeout": 5
-            }
-        )
-        assert response.status_code == 200
-        data = response.json()
-        # May succeed or fail depending on network restrictions
-        assert data["status"] in [ExecutionStatus.SUCCESS, ExecutionStatus.ERROR, ExecutionStatus.FAILED, ExecutionStatus.TIMEOUT]
+    """Test cases for network access attempts.
+
+    Workers run with EXEC_AGENT_STUB_NETWORK=1 (set in conftest), so any
+    outbound connection is refused immediately - the tests exercise the
+    isolation path without real DNS lookups or TCP timeouts.
+    """
+
+    @pytest.mark.parametrize("code", [
+        # HTTP request via urllib
+        "import urllib.request\ntry:\n    urllib.request.urlopen('http://example.com', timeout=2)\n    print('connected')\nexcept Exception as e:\n    print(f'error: {type(e).__name__}')",
+        # Raw socket connect
+        "import socket\ntry:\n    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)\n    s.connect(('example.com', 80))\n    print('connected')\nexcept Exception as e:\n    print(f'error: {type(e).__name__}')",
+    ], ids=["http-request", "socket-connect"])
+    def test_network_access_refused(self, client, code):
+        """Test that outbound connection attempts fail fast."""
+        response = post(client, {"code": code, "timeout": 5})
+        assert response.status_code == 200
+        data = parsed(response)
+        assert data["status"] == ExecutionStatus.SUCCESS
+        assert "error:" in data["stdout"]
+        assert "connected" not in data["stdout"]
 
 
 class TestImportDependencies:
     """Test cases for importing dependencies."""
     
-    def test_standard_library_import(self):
+    def test_standard_library_import(self, client):
         """Test importing standard library modules."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "import json\nimport os\nimport sys\ndata = {'key': 'value'}\nprint(json.dumps(data))",
-                "timeout": 5
-            }
-        )
+        response = post(client, {
+            "code": "import json\nimport os\nimport sys\ndata = {'key': 'value'}\nprint(json.dumps(data))",
+            "timeout": 5
+        })
         assert response.status_code == 200
-        data = response.json()
+        data = parsed(response)
         assert data["status"] == ExecutionStatus.SUCCESS
         assert "key" in data["stdout"] and "value" in data["stdout"]
     
-    def test_missing_third_party_import(self):
+    def test_missing_third_party_import(self, client):
         """Test importing non-existent third-party module."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "import nonexistent_module\nprint('imported')",
-                "timeout": 5
-            }
-        )
+        response = post(client, {
+            "code": "import nonexistent_module\nprint('imported')",
+            "timeout": 5
+        })
         assert response.status_code == 200
-        data = response.json()
-        assert data["status"] in [ExecutionStatus.ERROR, ExecutionStatus.FAILED]
-        assert "ModuleNotFoundError" in data["stderr"] or "ImportError" in data["stderr"] or "No module named" in data["stderr"]
+        data = parsed(response)
+        assert_error(data, "no module named")
     
-    def test_import_numpy(self):
+    def test_import_numpy(self, client):
         """Test importing numpy (may or may not be available)."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "try:\n    import numpy as np\n    print('numpy available')\nexcept ImportError:\n    print('numpy not available')",
-                "timeout": 5
-            }
-        )
+        response = post(client, {
+            "code": "try:\n    import numpy as np\n    print('numpy available')\nexcept ImportError:\n    print('numpy not available')",
+            "timeout": 5
+        })
         assert response.status_code == 200
-        data = response.json()
+        data = parsed(response)
         assert data["status"] == ExecutionStatus.SUCCESS
         # Either numpy is available or not, both are valid
         assert "numpy" in data["stdout"].lower()
     
-    def test_import_requests(self):
+    def test_import_requests(self, client):
         """Test importing requests library (may or may not be available)."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "try:\n    import requests\n    print('requests available')\nexcept ImportError:\n    print('requests not available')",
-                "timeout": 5
-            }
-        )
+        response = post(client, {
+            "code": "try:\n    import requests\n    print('requests available')\nexcept ImportError:\n    print('requests not available')",
+            "timeout": 5
+        })
         assert response.status_code == 200
-        data = response.json()
+        data = parsed(response)
         assert data["status"] == ExecutionStatus.SUCCESS
         assert "requests" in data["stdout"].lower()
 
@@ -532,94 +463,78 @@ class TestImportDependencies:
 class TestEdgeCases:
     """Additional edge cases and boundary conditions."""
     
-    def test_very_long_code(self):
+    def test_very_long_code(self, client):
         """Test execution of very long code string."""
         long_code = "x = 0\n" * 1000 + "print(x)"
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": long_code,
-                "timeout": 5
-            }
-        )
+        response = post(client, {
+            "code": long_code,
+            "timeout": 5
+        })
         assert response.status_code == 200
-        data = response.json()
+        data = parsed(response)
         assert data["status"] == ExecutionStatus.SUCCESS
     
-    def test_minimum_timeout(self):
+    def test_minimum_timeout(self, client):
         """Test with minimum timeout value."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "print('quick')",
-                "timeout": 1
-            }
-        )
+        response = post(client, {
+            "code": "print('quick')",
+            "timeout": 1
+        })
         assert response.status_code == 200
-        data = response.json()
+        data = parsed(response)
         assert data["status"] == ExecutionStatus.SUCCESS
     
-    def test_maximum_timeout(self):
+    def test_maximum_timeout(self, client):
         """Test with maximum timeout value."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "print('test')",
-                "timeout": 30
-            }
-        )
+        response = post(client, {
+            "code": "print('test')",
+            "timeout": 30
+        })
         assert response.status_code == 200
-        data = response.json()
+        data = parsed(response)
         assert data["status"] == ExecutionStatus.SUCCESS
     
-    def test_unicode_characters(self):
+    def test_unicode_characters(self, client):
         """Test code with unicode characters."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "print('Hello 世界 🌍')\nprint('测试')",
-                "timeout": 5
-            }
-        )
+        response = post(client, {
+            "code": "print('Hello 世界 🌍')\nprint('测试')",
+            "timeout": 5
+        })
         assert response.status_code == 200
-        data = response.json()
+        data = parsed(response)
         assert data["status"] == ExecutionStatus.SUCCESS
     
-    def test_special_characters_in_output(self):
+    def test_lone_surrogate_in_output(self, client):
+        """Test output containing an unpaired surrogate (invalid UTF-8)."""
+        response = post(client, {
+            "code": "print(chr(0xd800))",
+            "timeout": 5
+        })
+        assert response.status_code == 200
+        data = parsed(response)
+        assert data["status"] == ExecutionStatus.SUCCESS
+
+    def test_special_characters_in_output(self, client):
         """Test output with special characters."""
-        response = client.post(
-            "/api/v1/execute",
-            json={
-                "code": "print('Line 1\\nLine 2\\tTabbed')\nprint('Quotes: \"test\" \\'test\\'')",
-                "timeout": 5
-            }
-        )
+        response = post(client, {
+            "code": "print('Line 1\\nLine 2\\tTabbed')\nprint('Quotes: \"test\" \\'test\\'')",
+            "timeout": 5
+        })
         assert response.status_code == 200
-        data = response.json()
+        data = parsed(response)
         assert data["status"] == ExecutionStatus.SUCCESS
 
 
-# Pytest hooks for logging
+# Per-test start/end logging. %s-style arguments defer formatting to the
+# handler, so a disabled level costs nothing but the isEnabledFor check.
+# The result-logging makereport hook lives in conftest.py, where pytest
+# actually registers hook implementations.
 @pytest.fixture(autouse=True)
 def log_test_execution(request):
     """Fixture to log test execution start and end."""
-    logger.info(f"Starting test: {request.node.name}")
+    logger.info("Starting test: %s", request.node.name)
     yield
-    logger.info(f"Completed test: {request.node.name}")
-
-
-@pytest.hookimpl(tryfirst=True, hookwrapper=True)
-def pytest_runtest_makereport(item, call):
-    """Hook to log test results."""
-    outcome = yield
-    rep = outcome.get_result()
-    if rep.when == "call":
-        if rep.failed:
-            logger.error(f"Test FAILED: {item.name} - {rep.longrepr}")
-        elif rep.skipped:
-            logger.warning(f"Test SKIPPED: {item.name}")
-        else:
-            logger.info(f"Test PASSED: {item.name}")
+    logger.info("Completed test: %s", request.node.name)
 
 
 if __name__ == "__main__":